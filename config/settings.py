@@ -6,4 +6,12 @@ deputy_url = f"https://sil.gobernacion.gob.mx/portal/ReporteSesion/{deputy}"
 
 scrape_targets = [
         {"url": senate_url, "filename": "senadores.json"},
-        {"url": deputy_url, "filename": "diputados.json"}]
\ No newline at end of file
+        {"url": deputy_url, "filename": "diputados.json"}]
+
+# Shared work queue for distributed session scraping.
+# Workers on several machines may share it over a network filesystem as long as their clocks are synchronized.
+# The crawl history used to schedule URLs is kept next to it (crawl_history.sqlite3).
+# The file is reused across crawls: the first worker started after a crawl finished re-queues done and failed URLs.
+queue_file = "work_queue/sessions_queue.sqlite3"
+queue_lease_seconds = 120
+queue_max_attempts = 3
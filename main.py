@@ -1,8 +1,12 @@
 import logging
 from scrapers.site_a_scraper.site_a_scraper import scrape_all_legislaturas
 from scrapers.site_b_scraper.site_b_scraper import process_all_legislatura_data
-from scrapers.site_c_scraper.site_c_scraper import process_sessions
-from config.settings import scrape_targets
+from scrapers.site_c_scraper.site_c_scraper import process_sessions, process_sessions_from_queue
+from scrapers.site_c_scraper.normalization import normalize_scraped_data
+from scrapers.site_c_scraper.aggregates import rebuild_aggregates
+from scrapers.site_c_scraper.excel_export import export_workbooks
+from scrapers.site_c_scraper.session_store import chamber_from_file
+from config.settings import scrape_targets, queue_file, queue_lease_seconds, queue_max_attempts
 
 
 class ScraperManager:
@@ -24,9 +28,10 @@ class ScraperManager:
         process_all_legislatura_data(urls_to_scrape=self.targets)
 
     def process_only_one_session_with_name(self, file_name: str, name: str):
-        """Process a single session by name within a given file."""
+        """Process a single session by name within a given file, then export its Excel workbooks."""
         logging.info(f"Processing session '{name}' from file {file_name}...")
         process_sessions(file=file_name, scrape_all=False, scrape_name=name, visible=True)
+        self.export_excels(chamber=chamber_from_file(file_name))
 
     def process_all_sessions(self):
         """Process all sessions for both senators and deputies."""
@@ -34,12 +39,43 @@ class ScraperManager:
         for file_name in ["senadores.json", "diputados.json"]:
             process_sessions(file=file_name, scrape_all=True, visible=True)
 
+    def process_all_sessions_from_queue(self):
+        """Process all sessions through the shared work queue; run this on every worker."""
+        logging.info(f"Processing all sessions through work queue {queue_file}...")
+        for file_name in ["senadores.json", "diputados.json"]:
+            process_sessions_from_queue(
+                file=file_name,
+                queue_file=queue_file,
+                scrape_all=True,
+                lease_seconds=queue_lease_seconds,
+                max_attempts=queue_max_attempts,
+            )
+
+    def normalize_sessions(self):
+        """Normalize all stored sessions into typed per-chamber tables."""
+        logging.info("Normalizing scraped sessions...")
+        normalize_scraped_data()
+
+    def rebuild_session_aggregates(self):
+        """Rebuild the per-legislatura aggregate cache from the stored sessions."""
+        logging.info("Rebuilding session aggregates...")
+        rebuild_aggregates()
+
+    def export_excels(self, per: str = "session", chamber: str = None):
+        """Export stored sessions to Excel, one workbook per session or per legislatura.
+
+        Only workbooks older than their stored sessions are rewritten.
+        """
+        logging.info(f"Exporting Excel workbooks per {per}...")
+        export_workbooks(per=per, chamber=chamber)
+
     def run_all(self):
         """Run the full scraping and processing workflow."""
         logging.info("Starting full web scraping process...")
         self.create_legislatura_json()
         self.extend_legislatura_json()
         self.process_all_sessions()
+        self.export_excels()
 
 
 if __name__ == "__main__":
@@ -50,6 +86,10 @@ if __name__ == "__main__":
     # manager.create_legislatura_json()
     # manager.extend_legislatura_json()
     # manager.process_all_sessions()
+    # manager.process_all_sessions_from_queue()  # start one per worker process/machine
+    # manager.normalize_sessions()
+    # manager.rebuild_session_aggregates()
+    # manager.export_excels(per="legislatura")
 
     # Run only one session
     manager.process_only_one_session_with_name(file_name="senadores.json", name="LXVI")
@@ -0,0 +1,266 @@
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from scrapers.site_c_scraper.records import SessionHeader, SessionRecord
+from scrapers.site_c_scraper.session_store import SessionStore
+
+# Aggregate kinds
+SESSIONS = "sessions"   # number of sessions, key is empty
+MATTERS = "matters"     # sum of 'count' of attended matters, key is the group
+AFFAIRS = "affairs"     # number of affairs, key is the Resultado
+
+PARTITION_COLUMNS = ("kind", "chamber", "legislatura", "month", "key")
+
+_DATE_INDEX = SessionHeader.COLUMNS.index('date')
+_GROUP_INDEX = SessionRecord.MATTER_COLUMNS.index('group')
+_COUNT_INDEX = SessionRecord.MATTER_COLUMNS.index('count')
+_RESULTADO_INDEX = SessionRecord.AFFAIR_COLUMNS.index('Resultado')
+
+
+def _contributions(chamber: Optional[str], legislatura: Optional[str], month: str,
+                   matters: Iterable[Tuple[Optional[str], Optional[int]]],
+                   resultados: Iterable[Optional[str]]) -> Dict[Tuple[str, str, str, str, str], int]:
+    chamber = chamber or ''
+    legislatura = legislatura or ''
+    totals = defaultdict(int)
+    totals[(SESSIONS, chamber, legislatura, month, '')] += 1
+    for group, count in matters:
+        totals[(MATTERS, chamber, legislatura, month, group or '')] += count or 0
+    for resultado in resultados:
+        totals[(AFFAIRS, chamber, legislatura, month, (resultado or '').strip())] += 1
+    return totals
+
+
+def session_contributions(session: Dict) -> Dict[Tuple[str, str, str, str, str], int]:
+    """What one stored session (SessionRecord.to_dict) adds to each aggregate partition"""
+    session_date = session['header'][_DATE_INDEX]
+    return _contributions(
+        session.get('chamber'), session.get('legislatura'), session_date[:7] if session_date else '',
+        ((row[_GROUP_INDEX], row[_COUNT_INDEX]) for row in session['matters']),
+        (row[_RESULTADO_INDEX] for row in session['affairs']),
+    )
+
+
+def record_contributions(record: SessionRecord) -> Dict[Tuple[str, str, str, str, str], int]:
+    """Same as session_contributions, straight from a record without serializing it"""
+    session_date = record.header.session_date
+    return _contributions(
+        record.chamber, record.legislatura, session_date.strftime("%Y-%m") if session_date else '',
+        ((matter.group, matter.count) for matter in record.matters),
+        (affair.resultado for affair in record.affairs),
+    )
+
+
+class SessionAggregates:
+    """Materialized counts per chamber, legislatura, month and group/Resultado.
+
+    Each saved session records its own contribution per partition. Saving a
+    session again first subtracts its previous contribution, so a re-scrape
+    only touches the partitions that session belongs to and queries never have
+    to re-read the sessions themselves.
+
+    Uses the rollback journal by default so the file is safe on shared
+    storage; pass journal_mode="WAL" for a local-only file.
+    """
+
+    def __init__(self, db_path: str, journal_mode: str = "DELETE"):
+        self.db_path = db_path
+        self.journal_mode = journal_mode
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.setup_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def setup_database(self):
+        """Create the aggregate and contribution tables if they don't exist"""
+        conn = self._connect()
+        try:
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS aggregates (
+                    kind TEXT NOT NULL,
+                    chamber TEXT NOT NULL,
+                    legislatura TEXT NOT NULL,
+                    month TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL,
+                    PRIMARY KEY (kind, chamber, legislatura, month, key)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS contributions (
+                    url TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    chamber TEXT NOT NULL,
+                    legislatura TEXT NOT NULL,
+                    month TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value INTEGER NOT NULL,
+                    PRIMARY KEY (url, kind, chamber, legislatura, month, key)
+                )
+                """
+            )
+        finally:
+            conn.close()
+
+    def _remove(self, conn, url: str, now: float) -> int:
+        """Subtract the stored contribution of `url` from its partitions (inside a transaction)"""
+        old = conn.execute(
+            "SELECT kind, chamber, legislatura, month, key, value FROM contributions WHERE url = ?", (url,)
+        ).fetchall()
+        partitions = [tuple(row)[:5] for row in old]
+        conn.executemany(
+            "UPDATE aggregates SET total = total - ?, updated_at = ? "
+            "WHERE kind = ? AND chamber = ? AND legislatura = ? AND month = ? AND key = ?",
+            [(row["value"], now) + partition for row, partition in zip(old, partitions)],
+        )
+        conn.executemany(
+            "DELETE FROM aggregates WHERE kind = ? AND chamber = ? AND legislatura = ? AND month = ? AND key = ? "
+            "AND total = 0",
+            partitions,
+        )
+        conn.execute("DELETE FROM contributions WHERE url = ?", (url,))
+        return len(old)
+
+    def _add(self, conn, url: str, contributions: Dict[Tuple, int], now: float) -> None:
+        """Record the contribution of `url` and add it to its partitions (inside a transaction)"""
+        conn.executemany(
+            "INSERT INTO contributions (url, kind, chamber, legislatura, month, key, value) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(url,) + partition + (value,) for partition, value in contributions.items()],
+        )
+        conn.executemany(
+            "INSERT INTO aggregates (kind, chamber, legislatura, month, key, total, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (kind, chamber, legislatura, month, key) "
+            "DO UPDATE SET total = total + excluded.total, updated_at = excluded.updated_at",
+            [partition + (value, now) for partition, value in contributions.items()],
+        )
+
+    def _replace(self, url: str, contributions: Dict[Tuple, int]) -> None:
+        """Swap the contribution of `url` for a new one in a single transaction"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._remove(conn, url, now)
+            self._add(conn, url, contributions, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def update_session_dict(self, session: Dict) -> None:
+        """Add (or replace) the contribution of a stored session dict"""
+        self._replace(session['url'], session_contributions(session))
+
+    def update_session(self, record: SessionRecord) -> None:
+        """Add (or replace) the contribution of a freshly scraped session"""
+        self._replace(record.url, record_contributions(record))
+
+    def remove_session(self, url: str) -> bool:
+        """Drop a session from all aggregates. Returns False if it was never counted."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            removed = self._remove(conn, url, time.time())
+            conn.execute("COMMIT")
+            return removed > 0
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def rebuild(self, sessions: Iterable[Dict]) -> int:
+        """Recompute everything from stored sessions (e.g. SessionStore.iter_sessions()).
+
+        A URL stored more than once counts with its latest scrape. The tables
+        are swapped in one transaction, so readers see either the old or the
+        new totals, never a half-built cache.
+
+        Returns:
+            int: Number of distinct session URLs counted.
+        """
+        # Only the (small) contributions are kept in memory, not the sessions
+        latest: Dict[str, Tuple[str, Dict[Tuple, int]]] = {}
+        for session in sessions:
+            scraped_at = session.get('scraped_at') or ''
+            current = latest.get(session['url'])
+            if current is None or scraped_at >= current[0]:
+                latest[session['url']] = (scraped_at, session_contributions(session))
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM aggregates")
+            conn.execute("DELETE FROM contributions")
+            for url, (_, contributions) in latest.items():
+                self._add(conn, url, contributions, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return len(latest)
+
+    def totals(self, kind: str, group_by: Sequence[str] = ("chamber", "legislatura", "key"),
+               **filters) -> Dict[Tuple, int]:
+        """Totals of one aggregate kind, rolled up to the `group_by` columns.
+
+        Filters are exact matches on chamber, legislatura, month or key, e.g.
+        totals(MATTERS, group_by=("key",), chamber="senadores", legislatura="LXVI").
+        """
+        columns = list(group_by)
+        for column in columns + list(filters):
+            if column not in PARTITION_COLUMNS[1:]:
+                raise ValueError(f"Unknown aggregate column: {column}")
+
+        where = ["kind = ?"] + [f"{column} = ?" for column in filters]
+        params = [kind] + list(filters.values())
+        select = ", ".join(columns) if columns else "'all'"
+        query = (f"SELECT {select}, SUM(total) AS total FROM aggregates "
+                 f"WHERE {' AND '.join(where)} GROUP BY {select} ORDER BY {select}")
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        return {tuple(row)[:-1]: row["total"] for row in rows}
+
+    def matters_per_group(self, **filters) -> Dict[Tuple, int]:
+        """Matters attended per chamber, legislatura and group"""
+        return self.totals(MATTERS, ("chamber", "legislatura", "key"), **filters)
+
+    def affairs_per_month(self, **filters) -> Dict[Tuple, int]:
+        """Affairs per chamber, month and Resultado (filter key='Aprobado' for approved ones)"""
+        return self.totals(AFFAIRS, ("chamber", "month", "key"), **filters)
+
+    def sessions_per_legislatura(self, **filters) -> Dict[Tuple, int]:
+        """Number of scraped sessions per chamber and legislatura"""
+        return self.totals(SESSIONS, ("chamber", "legislatura"), **filters)
+
+
+def rebuild_aggregates(data_folder: str = "scraped_data") -> SessionAggregates:
+    """Rebuild the aggregate cache of a session store folder (relative to the project root)"""
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    folder = os.path.join(project_root, data_folder)
+    aggregates = SessionAggregates(os.path.join(folder, "aggregates.sqlite3"))
+    count = aggregates.rebuild(SessionStore(folder).iter_sessions())
+    print(f"✅ Aggregates rebuilt from {count} stored sessions")
+    return aggregates
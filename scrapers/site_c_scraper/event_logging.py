@@ -0,0 +1,143 @@
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class EventFilter(logging.Filter):
+    """Pass only records that carry (or, with exclude=True, don't carry) a structured event"""
+
+    def __init__(self, exclude: bool = False):
+        super().__init__()
+        self.exclude = exclude
+
+    def filter(self, record):
+        has_event = hasattr(record, "event")
+        return not has_event if self.exclude else has_event
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Format a record's `event` dict as one JSON line"""
+
+    def format(self, record):
+        event = {"ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")}
+        event.update(record.event)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+def start_async_logging(logger: logging.Logger, log_filepath: str, events_filepath: str,
+                        level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Route `logger` through an in-memory queue drained by a background listener.
+
+    The calling thread only enqueues records; formatting and file I/O happen on
+    the listener thread. Plain records go to `log_filepath`, records logged with
+    extra={"event": {...}} go to `events_filepath` as JSON lines.
+
+    `level` only applies to the text log; events (logged at INFO) are always
+    written, even when the text log is restricted to warnings.
+
+    Returns:
+        QueueListener: Call .stop() on it to flush and release the files.
+    """
+    log_queue = queue.SimpleQueue()
+
+    file_handler = logging.FileHandler(log_filepath, encoding='utf-8')
+    file_handler.setLevel(level)
+    file_handler.addFilter(EventFilter(exclude=True))
+    file_handler.setFormatter(logging.Formatter(
+        '%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+
+    events_handler = logging.FileHandler(events_filepath, encoding='utf-8')
+    events_handler.addFilter(EventFilter())
+    events_handler.setFormatter(JsonLineFormatter())
+
+    # The logger lets INFO through for the events file; the text handler does the level filtering
+    logger.setLevel(min(level, logging.INFO))
+    logger.propagate = False
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, events_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+class ProgressRenderer:
+    """Human progress line redrawn at a fixed rate instead of once per URL"""
+
+    def __init__(self, total: int, interval: float = 1.0, stream=None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        self.successful = 0
+        self.failed = 0
+        self.current: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="progress-renderer", daemon=True)
+        self._start_time = time.time()
+
+    @property
+    def processed(self) -> int:
+        return self.successful + self.failed
+
+    def start(self):
+        self._start_time = time.time()
+        self._thread.start()
+        return self
+
+    def set_current(self, label: str):
+        self.current = label
+
+    def update(self, success: bool):
+        with self._lock:
+            if success:
+                self.successful += 1
+            else:
+                self.failed += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            processed, successful = self.processed, self.successful
+        elapsed = time.time() - self._start_time
+        avg = elapsed / processed if processed else 0.0
+        return {
+            "processed": processed,
+            "successful": successful,
+            "success_rate": (successful / processed * 100) if processed else 0.0,
+            "elapsed": elapsed,
+            "avg": avg,
+            "eta": (self.total - processed) * avg if self.total else 0.0,
+        }
+
+    def render(self) -> str:
+        s = self.stats()
+        total = self.total if self.total else "?"
+        line = (f"[{s['processed']}/{total}] 📊 Success: {s['successful']} ({s['success_rate']:.1f}%) | "
+                f"Avg: {s['avg']:.1f}s | ETA: {s['eta']/60:.1f}m")
+        if self.current:
+            line += f" | {self.current}"
+        return line
+
+    def _draw(self):
+        self.stream.write("\r\033[K" + self.render())
+        self.stream.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._draw()
+
+    def stop(self):
+        """Stop refreshing and leave the final line on screen"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._draw()
+        self.stream.write("\n")
+        self.stream.flush()
@@ -0,0 +1,167 @@
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time as dtime
+from typing import Dict, List, Tuple
+
+from openpyxl import Workbook
+
+from scrapers.site_c_scraper.records import SessionRecord
+from scrapers.site_c_scraper.session_store import SessionStore
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Matter and affair rows also get the session URL: session_id (the date) is not
+# unique within a legislatura workbook, the URL is
+SHEETS = (
+    ('Session_Headers', 'header', SessionRecord.HEADER_COLUMNS),
+    ('Matters_Attended', 'matters', SessionRecord.MATTER_COLUMNS + ('url',)),
+    ('Affairs', 'affairs', SessionRecord.AFFAIR_COLUMNS + ('url',)),
+)
+
+# Columns stored as ISO strings that should become real Excel dates/times again
+_DATE_COLUMNS = {
+    'header': {SessionRecord.HEADER_COLUMNS.index('date'): date,
+               SessionRecord.HEADER_COLUMNS.index('start_time'): dtime,
+               SessionRecord.HEADER_COLUMNS.index('end_time'): dtime,
+               SessionRecord.HEADER_COLUMNS.index('scraped_at'): datetime},
+    'matters': {},
+    'affairs': {SessionRecord.AFFAIR_COLUMNS.index('Publicación'): date},
+}
+
+
+def _typed_row(row: List, kind: str) -> List:
+    """Turn the ISO strings of a stored row back into date/time values"""
+    converters = _DATE_COLUMNS[kind]
+    if not converters:
+        return row
+    row = list(row)
+    for index, cls in converters.items():
+        if row[index]:
+            try:
+                row[index] = cls.fromisoformat(row[index])
+            except (TypeError, ValueError):
+                pass
+    return row
+
+
+def write_workbook(output_path: str, session_paths: List[str]) -> Tuple[str, int]:
+    """Stream the given stored sessions into one workbook.
+
+    Uses openpyxl's write-only mode, so rows go straight to disk and memory
+    stays flat no matter how many sessions end up in the workbook. Only one
+    stored session is held in memory at a time.
+
+    Returns:
+        tuple: (output_path, number of sessions written)
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    workbook = Workbook(write_only=True)
+    sheets = {}
+
+    def sheet_for(name, columns):
+        # Sheets are created on first row, like the per-session export which skips empty sheets
+        if name not in sheets:
+            sheets[name] = workbook.create_sheet(name)
+            sheets[name].append(list(columns))
+        return sheets[name]
+
+    count = 0
+    for path in session_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            session = json.load(f)
+        for name, kind, columns in SHEETS:
+            if kind == 'header':
+                rows = [session[kind]]
+            else:
+                rows = [row + [session['url']] for row in session[kind]]
+            if rows:
+                sheet = sheet_for(name, columns)
+                for row in rows:
+                    sheet.append(_typed_row(row, kind))
+        count += 1
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    workbook.save(tmp_path)
+    os.replace(tmp_path, output_path)
+    return output_path, count
+
+
+def _export_job(job: Tuple[str, List[str]]) -> Tuple[str, int]:
+    output_path, session_paths = job
+    return write_workbook(output_path, session_paths)
+
+
+def _is_up_to_date(output_path: str, session_paths: List[str]) -> bool:
+    if not os.path.exists(output_path):
+        return False
+    output_mtime = os.path.getmtime(output_path)
+    return all(os.path.getmtime(path) <= output_mtime for path in session_paths)
+
+
+def plan_exports(store: SessionStore, output_folder: str, per: str = "session",
+                 chamber: str = None, legislatura: str = None) -> List[Tuple[str, List[str]]]:
+    """List (workbook path, stored session paths) jobs.
+
+    per="session" writes <output>/<chamber>/<legislatura>/parliamentary_session_<id>.xlsx,
+    per="legislatura" writes <output>/<chamber>/parliamentary_sessions_<legislatura>.xlsx.
+    """
+    if per not in ("session", "legislatura"):
+        raise ValueError(f"per must be 'session' or 'legislatura', got {per!r}")
+
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for path in store.iter_paths(chamber=chamber, legislatura=legislatura):
+        legislatura_dir = os.path.dirname(path)
+        chamber_name = os.path.basename(os.path.dirname(legislatura_dir))
+        legislatura_name = os.path.basename(legislatura_dir)
+        if per == "session":
+            stem = os.path.splitext(os.path.basename(path))[0]
+            output_path = os.path.join(output_folder, chamber_name, legislatura_name,
+                                       f"parliamentary_session_{stem}.xlsx")
+        else:
+            output_path = os.path.join(output_folder, chamber_name,
+                                       f"parliamentary_sessions_{legislatura_name}.xlsx")
+        groups[output_path].append(path)
+    return list(groups.items())
+
+
+def export_workbooks(data_folder: str = "scraped_data", output_folder: str = "exported_excels",
+                     per: str = "session", chamber: str = None, legislatura: str = None,
+                     workers: int = None, force: bool = False) -> int:
+    """Export stored sessions to Excel in parallel, independently of scraping.
+
+    Args:
+        data_folder (str): JSON session store folder, relative to the project root.
+        output_folder (str): Workbook folder, relative to the project root.
+        per (str): "session" for one workbook per session, "legislatura" for one per legislatura.
+        chamber (str): Only export this chamber ("senadores"/"diputados").
+        legislatura (str): Only export this legislatura.
+        workers (int): Worker processes; defaults to the number of CPUs.
+        force (bool): Rewrite workbooks even if they are newer than their sessions.
+
+    Returns:
+        int: Number of workbooks written.
+    """
+    start_time = time.time()
+    store = SessionStore(os.path.join(PROJECT_ROOT, data_folder))
+    jobs = plan_exports(store, os.path.join(PROJECT_ROOT, output_folder), per, chamber, legislatura)
+    if not force:
+        jobs = [job for job in jobs if not _is_up_to_date(*job)]
+
+    print(f"📤 Exporting {len(jobs)} workbooks (one per {per})...")
+    if not jobs:
+        return 0
+
+    written = 0
+    sessions = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Many small per-session jobs are batched to keep inter-process overhead down
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        for output_path, count in executor.map(_export_job, jobs, chunksize=chunksize):
+            written += 1
+            sessions += count
+
+    print(f"✅ {written} workbooks with {sessions} sessions written in {time.time() - start_time:.1f}s")
+    return written
@@ -0,0 +1,290 @@
+import glob
+import importlib.util
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scrapers.site_c_scraper.records import DATE_FORMATS, SessionRecord
+from scrapers.site_c_scraper.session_store import SessionStore
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# pandas writes parquet through pyarrow or fastparquet; without either the tables are pickled,
+# which keeps the same dtypes (categories, timedeltas, nullable ints) but only reads back in pandas
+PARQUET_AVAILABLE = any(importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet"))
+
+# Extra columns attached to every matter/affair row so rows can be traced back to their session
+# (scraped_at tells apart two scrapes of the same URL)
+SESSION_KEY_COLUMNS = ('url', 'chamber', 'legislatura', 'scraped_at')
+
+
+@dataclass
+class NormalizedTables:
+    """Typed, deduplicated tables of one chamber"""
+    headers: pd.DataFrame
+    matters: pd.DataFrame
+    affairs: pd.DataFrame
+
+    def write(self, folder: str) -> None:
+        """Write the three tables into `folder` as parquet files, or as pickles without a parquet engine"""
+        os.makedirs(folder, exist_ok=True)
+        for name, frame in (("headers", self.headers), ("matters", self.matters), ("affairs", self.affairs)):
+            if PARQUET_AVAILABLE:
+                frame.to_parquet(os.path.join(folder, f"{name}.parquet"), index=False)
+            else:
+                frame.to_pickle(os.path.join(folder, f"{name}.pkl"))
+
+
+# ---------------------------------------------------------------------------
+# Loading raw rows
+# ---------------------------------------------------------------------------
+
+def tables_from_sessions(sessions: Iterable[Dict]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Build raw header/matter/affair frames from stored session dicts (see SessionRecord.to_dict)"""
+    header_rows, matter_rows, affair_rows = [], [], []
+    for session in sessions:
+        key = [session['url'], session['chamber'], session['legislatura'], session['scraped_at']]
+        header_rows.append(session['header'])
+        matter_rows.extend(row + key for row in session['matters'])
+        affair_rows.extend(row + key for row in session['affairs'])
+
+    headers = pd.DataFrame.from_records(header_rows, columns=SessionRecord.HEADER_COLUMNS)
+    matters = pd.DataFrame.from_records(matter_rows, columns=SessionRecord.MATTER_COLUMNS + SESSION_KEY_COLUMNS)
+    affairs = pd.DataFrame.from_records(affair_rows, columns=SessionRecord.AFFAIR_COLUMNS + SESSION_KEY_COLUMNS)
+    return headers, matters, affairs
+
+
+def load_store_tables(data_folder: str, chamber: str = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Load every stored session of the JSON session store into raw frames"""
+    return tables_from_sessions(SessionStore(data_folder).iter_sessions(chamber=chamber))
+
+
+def load_excel_exports(folder: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Load the per-session Excel files written by save_session_to_excel.
+
+    Older exports have no chamber/legislatura/scraped_at columns; their rows get NA there.
+    """
+    headers, matters, affairs = [], [], []
+    for path in sorted(glob.glob(os.path.join(folder, "parliamentary_session_*.xlsx"))):
+        sheets = pd.read_excel(path, sheet_name=None, dtype=str)
+        header = sheets.get('Session_Headers')
+        if header is None or header.empty:
+            continue
+        header = header.reindex(columns=SessionRecord.HEADER_COLUMNS)
+        key = header.loc[0, list(SESSION_KEY_COLUMNS)]
+        headers.append(header)
+        if 'Matters_Attended' in sheets:
+            matters.append(sheets['Matters_Attended'].assign(**key.to_dict()))
+        if 'Affairs' in sheets:
+            affairs.append(sheets['Affairs'].assign(**key.to_dict()))
+
+    def concat(frames, columns):
+        frames = [frame.reindex(columns=columns) for frame in frames]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    return (
+        concat(headers, SessionRecord.HEADER_COLUMNS),
+        concat(matters, SessionRecord.MATTER_COLUMNS + SESSION_KEY_COLUMNS),
+        concat(affairs, SessionRecord.AFFAIR_COLUMNS + SESSION_KEY_COLUMNS),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Vectorized column conversions
+# ---------------------------------------------------------------------------
+
+def parse_dates(series: pd.Series) -> pd.Series:
+    """Parse dates in any of DATE_FORMATS without a per-row Python loop.
+
+    Each format is tried once over the still-unparsed distinct values, and the
+    result is mapped back onto the full column.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.normalize()
+
+    text = series.astype("string").str.strip().str.slice(0, 10)
+    uniques = pd.Series(text.dropna().unique(), dtype="string")
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(uniques[missing], format=fmt, errors="coerce")
+
+    lookup = dict(zip(uniques.tolist(), parsed.tolist()))
+    return pd.Series(text.map(lookup).values, index=series.index, dtype="datetime64[ns]")
+
+
+def parse_timestamps(series: pd.Series) -> pd.Series:
+    """ISO timestamps, with or without fraction and with 'T' or ' ' as separator.
+
+    Without an explicit format pandas infers one from the first value and
+    turns every differently shaped value into NaT.
+    """
+    return pd.to_datetime(series, format="ISO8601", errors="coerce")
+
+
+def parse_times(series: pd.Series) -> pd.Series:
+    """First HH:MM in the text as a timedelta since midnight"""
+    hhmm = series.astype("string").str.extract(r"(\d{1,2}:\d{2})", expand=False)
+    return pd.to_timedelta(hhmm + ":00", errors="coerce")
+
+
+def parse_counts(series: pd.Series) -> pd.Series:
+    """First integer in the text as a nullable integer"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype("Int32")
+    digits = series.astype("string").str.extract(r"(\d+)", expand=False)
+    return pd.to_numeric(digits, errors="coerce").astype("Int32")
+
+
+def clean_text(series: pd.Series) -> pd.Series:
+    """Trim and collapse whitespace; empty strings become NA"""
+    text = series.astype("string").str.strip().str.replace(r"\s+", " ", regex=True)
+    return text.mask(text == "")
+
+
+def to_category(series: pd.Series) -> pd.Series:
+    return clean_text(series).astype("category")
+
+
+# ---------------------------------------------------------------------------
+# Normalization
+# ---------------------------------------------------------------------------
+
+def normalize_headers(headers: pd.DataFrame) -> pd.DataFrame:
+    result = pd.DataFrame({
+        'session_id': headers['session_id'].astype("string"),
+        'chamber': to_category(headers['chamber']),
+        'legislatura': to_category(headers['legislatura']),
+        'url': headers['url'].astype("string"),
+        # Typed values missing from the store (unparseable on the page) get another try from the raw text
+        'date': parse_dates(headers['date'].fillna(headers['date_raw'])),
+        'start_time': parse_times(headers['start_time'].fillna(headers['start_time_raw'])),
+        'end_time': parse_times(headers['end_time'].fillna(headers['end_time_raw'])),
+        'starting_quorum': parse_counts(headers['starting_quorum']),
+        'next_session': clean_text(headers['next_session']),
+        'presiding_officer': clean_text(headers['presiding_officer']),
+        'scraped_at': parse_timestamps(headers['scraped_at']),
+        'date_raw': clean_text(headers['date_raw']),
+        'start_time_raw': clean_text(headers['start_time_raw']),
+        'end_time_raw': clean_text(headers['end_time_raw']),
+    })
+    result['duration'] = result['end_time'] - result['start_time']
+
+    # A URL scraped more than once keeps its latest scrape
+    return (result.sort_values('scraped_at', kind='stable')
+                  .drop_duplicates(subset=['chamber', 'url'], keep='last')
+                  .reset_index(drop=True))
+
+
+def normalize_matters(matters: pd.DataFrame) -> pd.DataFrame:
+    result = pd.DataFrame({
+        'session_id': matters['session_id'].astype("string"),
+        'chamber': to_category(matters['chamber']),
+        'legislatura': to_category(matters['legislatura']),
+        'url': matters['url'].astype("string"),
+        'scraped_at': parse_timestamps(matters['scraped_at']),
+        'group': to_category(matters['group']),
+        'matter_name': clean_text(matters['matter_name']),
+        'count': parse_counts(matters['count']),
+    })
+    return (result.drop_duplicates(subset=['chamber', 'url', 'scraped_at', 'group', 'matter_name'], keep='last')
+                  .reset_index(drop=True))
+
+
+def normalize_affairs(affairs: pd.DataFrame) -> pd.DataFrame:
+    result = pd.DataFrame({
+        'session_id': affairs['session_id'].astype("string"),
+        'chamber': to_category(affairs['chamber']),
+        'legislatura': to_category(affairs['legislatura']),
+        'url': affairs['url'].astype("string"),
+        'scraped_at': parse_timestamps(affairs['scraped_at']),
+        'affair_id': affairs['affair_id'].astype("string"),
+        'title': clean_text(affairs['title']),
+        'text': clean_text(affairs['text']),
+        'aspectos': clean_text(affairs['Aspectos']),
+        'ultimo': to_category(affairs['Último']),
+        'resultado': to_category(affairs['Resultado']),
+        'link': affairs['link'].astype("string"),
+        'publicacion': parse_dates(affairs['Publicación'].fillna(affairs['Publicación_raw'])),
+        'publicacion_raw': clean_text(affairs['Publicación_raw']),
+    })
+    return (result.drop_duplicates(subset=['chamber', 'url', 'scraped_at', 'affair_id'], keep='last')
+                  .reset_index(drop=True))
+
+
+def _scrape_key(frame: pd.DataFrame) -> pd.Series:
+    """One string per (chamber, url, scraped_at), NA parts included"""
+    return (frame['chamber'].astype("string").fillna("")
+            + "\x1f" + frame['url'].fillna("")
+            # A fixed format: astype("string") renders midnight differently depending on the other values
+            + "\x1f" + frame['scraped_at'].dt.strftime("%Y-%m-%dT%H:%M:%S.%f").astype("string").fillna(""))
+
+
+def _restrict_to_headers(frame: pd.DataFrame, headers: pd.DataFrame) -> pd.DataFrame:
+    """Keep only rows of the scrape that survived header deduplication"""
+    keep = _scrape_key(frame).isin(_scrape_key(headers)) | frame['url'].isna()
+    return frame[keep.to_numpy(dtype=bool)].reset_index(drop=True)
+
+
+def normalize_tables(headers: pd.DataFrame, matters: pd.DataFrame, affairs: pd.DataFrame) -> Dict[str, NormalizedTables]:
+    """Normalize raw frames in bulk and split them by chamber"""
+    headers = normalize_headers(headers)
+    matters = _restrict_to_headers(normalize_matters(matters), headers)
+    affairs = _restrict_to_headers(normalize_affairs(affairs), headers)
+
+    chambers = pd.unique(np.concatenate([
+        headers['chamber'].astype(object).fillna("unknown").to_numpy(),
+        matters['chamber'].astype(object).fillna("unknown").to_numpy(),
+        affairs['chamber'].astype(object).fillna("unknown").to_numpy(),
+    ]))
+
+    def split(frame, chamber):
+        mask = frame['chamber'].astype(object).fillna("unknown") == chamber
+        part = frame[mask].reset_index(drop=True)
+        # Re-derive categories so each chamber only carries its own levels
+        for column in part.select_dtypes("category").columns:
+            part[column] = part[column].cat.remove_unused_categories()
+        return part
+
+    return {
+        chamber: NormalizedTables(split(headers, chamber), split(matters, chamber), split(affairs, chamber))
+        for chamber in chambers
+    }
+
+
+def normalize_scraped_data(data_folder: str = "scraped_data", output_folder: str = "normalized_data",
+                           excel_folder: str = None) -> Dict[str, NormalizedTables]:
+    """Normalize every stored session and write one set of tables per chamber.
+
+    Tables are parquet files when pyarrow or fastparquet is installed, pandas
+    pickles (.pkl) otherwise.
+
+    Args:
+        data_folder (str): JSON session store folder, relative to the project root.
+        output_folder (str): Where the per-chamber tables are written, relative to the project root.
+        excel_folder (str): Optional folder of legacy Excel exports to include as well.
+    """
+    start_time = time.time()
+    if not PARQUET_AVAILABLE:
+        print("⚠️  No parquet engine installed (pip install pyarrow); writing pandas pickles instead")
+    raw = [load_store_tables(os.path.join(PROJECT_ROOT, data_folder))]
+    if excel_folder:
+        raw.append(load_excel_exports(os.path.join(PROJECT_ROOT, excel_folder)))
+
+    headers, matters, affairs = (pd.concat(frames, ignore_index=True) for frames in zip(*raw))
+    print(f"📥 Loaded {len(headers)} sessions, {len(matters)} matters, {len(affairs)} affairs")
+
+    tables = normalize_tables(headers, matters, affairs)
+    for chamber, chamber_tables in tables.items():
+        chamber_tables.write(os.path.join(PROJECT_ROOT, output_folder, chamber))
+        print(f"✅ {chamber}: {len(chamber_tables.headers)} sessions, "
+              f"{len(chamber_tables.matters)} matters, {len(chamber_tables.affairs)} affairs")
+
+    print(f"⏱️  Normalized in {time.time() - start_time:.2f}s")
+    return tables
@@ -0,0 +1,155 @@
+import cProfile
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional
+
+
+class StackSampler:
+    """Cheap wall-clock sampler: records the stack of one thread every `interval` seconds.
+
+    Much lighter than cProfile, so it can run on every call and only be kept
+    when the call turns out to be slow. Stacks are counted in collapsed form
+    ("outer;inner;leaf"), which flame graph tools read directly.
+    """
+
+    def __init__(self, thread_id: int = None, interval: float = 0.01):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileRun:
+    """State of one profiled call; `meta` is saved alongside the profile"""
+
+    def __init__(self, url: str, full: bool, sampler: Optional[StackSampler]):
+        self.url = url
+        self.full = full
+        self.sampler = sampler
+        self.profile = cProfile.Profile() if full else None
+        self.meta = {}
+        self.elapsed = 0.0
+
+
+class ScrapeProfiler:
+    """Opt-in profiling of scrape_session calls.
+
+    - A `profile_rate` fraction of calls runs under cProfile.
+    - With `slow_threshold` set, every call runs a stack sampler and calls
+      slower than the threshold are kept.
+
+    Kept calls are written to <folder>/<timestamp>_<hash>/ with the cProfile
+    dump (profile.prof), sampled stacks (stacks.txt), the page HTML
+    (page.html) and metadata (meta.json). Failing to write them is logged to
+    `logger` and never fails the profiled call.
+    """
+
+    def __init__(self, folder: str, profile_rate: float = 0.0, slow_threshold: float = None,
+                 sample_interval: float = 0.01, logger: logging.Logger = None):
+        self.folder = folder
+        self.logger = logger or logging.getLogger(__name__)
+        self.profile_rate = profile_rate
+        self.slow_threshold = slow_threshold
+        self.sample_interval = sample_interval
+        if self.enabled:
+            os.makedirs(self.folder, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile_rate > 0 or self.slow_threshold is not None
+
+    @contextmanager
+    def profile(self, url: str, page_source: Callable[[], str] = None):
+        """Profile the body of the with-block according to the configured policy"""
+        full = self.profile_rate > 0 and random.random() < self.profile_rate
+        sampler = StackSampler(interval=self.sample_interval).start() if self.slow_threshold is not None else None
+        run = ProfileRun(url, full, sampler)
+
+        start_time = time.perf_counter()
+        if run.profile:
+            run.profile.enable()
+        try:
+            yield run
+        finally:
+            if run.profile:
+                run.profile.disable()
+            if sampler:
+                sampler.stop()
+            run.elapsed = time.perf_counter() - start_time
+
+            slow = self.slow_threshold is not None and run.elapsed > self.slow_threshold
+            if full or slow:
+                run.meta['reason'] = 'slow' if slow else 'sampled'
+                try:
+                    self.save(run, page_source)
+                except Exception as e:
+                    self.logger.warning(f"Could not save profile of {url}: {type(e).__name__}: {e}")
+
+    def save(self, run: ProfileRun, page_source: Callable[[], str] = None) -> str:
+        """Write everything captured for one call and return its folder"""
+        now = datetime.now()
+        url_hash = hashlib.sha1(run.url.encode("utf-8")).hexdigest()[:10]
+        path = os.path.join(self.folder, f"{now.strftime('%Y%m%d_%H%M%S')}_{now.microsecond:06d}_{url_hash}")
+        os.makedirs(path, exist_ok=True)
+
+        if run.profile:
+            run.profile.dump_stats(os.path.join(path, "profile.prof"))
+        if run.sampler:
+            run.sampler.write_collapsed(os.path.join(path, "stacks.txt"))
+
+        if page_source:
+            try:
+                html = page_source()
+            except Exception as e:
+                html = None
+                run.meta['page_source_error'] = f"{type(e).__name__}: {e}"
+            if html is not None:
+                with open(os.path.join(path, "page.html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+
+        meta = {
+            'url': run.url,
+            'elapsed': round(run.elapsed, 3),
+            'full_profile': run.full,
+            'slow_threshold': self.slow_threshold,
+            'saved_at': now.isoformat(),
+        }
+        meta.update(run.meta)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False, default=str)
+        return path
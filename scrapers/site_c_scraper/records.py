@@ -0,0 +1,164 @@
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from typing import ClassVar, List, Optional, Tuple
+
+DATE_FORMATS = ['%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d']
+_TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{2})")
+_INT_PATTERN = re.compile(r"\d+")
+
+
+def parse_date(text: Optional[str]) -> Optional[date]:
+    """Parse a date in any of the formats used by the SIL portal, None if it can't be parsed"""
+    if not text:
+        return None
+    text = text.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_time(text: Optional[str]) -> Optional[time]:
+    """Parse the first HH:MM found in the text ('11:35 hrs.' -> 11:35)"""
+    if not text:
+        return None
+    match = _TIME_PATTERN.search(text)
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+def parse_int(text: Optional[str]) -> Optional[int]:
+    """Parse the first integer found in the text"""
+    if not text:
+        return None
+    match = _INT_PATTERN.search(text)
+    return int(match.group()) if match else None
+
+
+@dataclass(slots=True)
+class SessionHeader:
+    """Session header ('Fecha', 'Inicia', 'Termina', ...).
+
+    Parsed values sit next to the text they came from, so a value that
+    couldn't be parsed is still exported as written on the page.
+    """
+    raw_date: Optional[str] = None
+    session_date: Optional[date] = None
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    starting_quorum: Optional[str] = None
+    next_session: Optional[str] = None
+    presiding_officer: Optional[str] = None
+    raw_start_time: Optional[str] = None
+    raw_end_time: Optional[str] = None
+
+    COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'date', 'start_time', 'end_time', 'starting_quorum', 'next_session', 'presiding_officer',
+        'date_raw', 'start_time_raw', 'end_time_raw',
+    )
+
+    def to_row(self) -> tuple:
+        return (self.session_date, self.start_time, self.end_time,
+                self.starting_quorum, self.next_session, self.presiding_officer,
+                self.raw_date, self.raw_start_time, self.raw_end_time)
+
+
+@dataclass(slots=True)
+class MatterRecord:
+    """One row of 'ASUNTOS ATENDIDOS'"""
+    group: Optional[str]
+    matter_name: str
+    count: Optional[int]
+
+    COLUMNS: ClassVar[Tuple[str, ...]] = ('group', 'matter_name', 'count')
+
+    def to_row(self) -> tuple:
+        return (self.group, self.matter_name, self.count)
+
+
+@dataclass(slots=True)
+class AffairRecord:
+    """One affair block of the 'ASUNTOS' section"""
+    affair_id: str
+    title: Optional[str] = None
+    text: Optional[str] = None
+    aspectos: Optional[str] = None
+    ultimo: Optional[str] = None
+    resultado: str = ''
+    link: Optional[str] = None
+    publicacion: Optional[date] = None
+    raw_publicacion: Optional[str] = None
+
+    # Column names are kept identical to the original Excel sheets, plus the raw publication text
+    COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'affair_id', 'title', 'text', 'Aspectos', 'Último', 'Resultado', 'link', 'Publicación',
+        'Publicación_raw',
+    )
+
+    def to_row(self) -> tuple:
+        return (self.affair_id, self.title, self.text, self.aspectos,
+                self.ultimo, self.resultado, self.link, self.publicacion, self.raw_publicacion)
+
+
+@dataclass(slots=True)
+class SessionRecord:
+    """A fully scraped session: header plus its matters and affairs"""
+    url: str
+    scraped_at: datetime
+    header: SessionHeader
+    matters: List[MatterRecord] = field(default_factory=list)
+    affairs: List[AffairRecord] = field(default_factory=list)
+    chamber: Optional[str] = None
+    legislatura: Optional[str] = None
+
+    HEADER_COLUMNS: ClassVar[Tuple[str, ...]] = SessionHeader.COLUMNS + (
+        'session_id', 'chamber', 'legislatura', 'url', 'scraped_at',
+    )
+    MATTER_COLUMNS: ClassVar[Tuple[str, ...]] = MatterRecord.COLUMNS + ('session_id',)
+    AFFAIR_COLUMNS: ClassVar[Tuple[str, ...]] = AffairRecord.COLUMNS + ('session_id',)
+
+    @property
+    def session_id(self) -> str:
+        """YYYYMMDD of the session date, falling back to the scrape date"""
+        return (self.header.session_date or self.scraped_at.date()).strftime("%Y%m%d")
+
+    def header_row(self) -> tuple:
+        return self.header.to_row() + (self.session_id, self.chamber, self.legislatura, self.url, self.scraped_at)
+
+    def matter_rows(self):
+        """Matter rows tagged with the session id, generated lazily"""
+        session_id = self.session_id
+        return (matter.to_row() + (session_id,) for matter in self.matters)
+
+    def affair_rows(self):
+        """Affair rows tagged with the session id, generated lazily"""
+        session_id = self.session_id
+        return (affair.to_row() + (session_id,) for affair in self.affairs)
+
+    def to_dict(self) -> dict:
+        """Compact JSON-ready form: one row list per record, columns given by the *_COLUMNS attributes"""
+        return {
+            'url': self.url,
+            'chamber': self.chamber,
+            'legislatura': self.legislatura,
+            'session_id': self.session_id,
+            'raw_date': self.header.raw_date,
+            'scraped_at': self.scraped_at.isoformat(),
+            'header': [_json_value(value) for value in self.header_row()],
+            'matters': [[_json_value(value) for value in row] for row in self.matter_rows()],
+            'affairs': [[_json_value(value) for value in row] for row in self.affair_rows()],
+        }
+
+
+def _json_value(value):
+    """Dates and times are stored as ISO strings"""
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
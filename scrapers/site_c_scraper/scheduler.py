@@ -0,0 +1,200 @@
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+_ROMAN_VALUES = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000}
+
+
+def roman_to_int(text: str) -> Optional[int]:
+    """'LXVI' -> 66; None if the text isn't a roman numeral"""
+    if not text or not re.fullmatch(r"[IVXLCDM]+", text.strip().upper()):
+        return None
+    values = [_ROMAN_VALUES[c] for c in text.strip().upper()]
+    return sum(-v if i + 1 < len(values) and v < values[i + 1] else v for i, v in enumerate(values))
+
+
+def legislatura_number(leg: Dict) -> int:
+    """Ordinal of a legislatura entry: its 'value' from the portal, else its roman name"""
+    value = leg.get("value")
+    if isinstance(value, int):
+        return value
+    return roman_to_int(leg.get("name", "")) or 0
+
+
+class CrawlHistory:
+    """Per-URL outcome and cost history, kept across runs in a SQLite file.
+
+    Costs are exponential moving averages of the scrape time, so a page that
+    was slow once doesn't stay expensive forever.
+
+    Uses the rollback journal by default so the file is safe on shared
+    storage; pass journal_mode="WAL" for a local-only file.
+    """
+
+    def __init__(self, db_path: str, smoothing: float = 0.3, journal_mode: str = "DELETE"):
+        self.db_path = db_path
+        self.smoothing = smoothing
+        self.journal_mode = journal_mode
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.setup_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def setup_database(self):
+        """Create the history table if it doesn't exist"""
+        conn = self._connect()
+        try:
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS url_history (
+                    url TEXT PRIMARY KEY,
+                    legislatura TEXT,
+                    last_success REAL,
+                    last_failure REAL,
+                    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                    cost REAL,
+                    samples INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+        finally:
+            conn.close()
+
+    def record(self, url: str, legislatura: str, success: bool, elapsed: float) -> None:
+        """Record the outcome and duration of one scrape"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                INSERT INTO url_history (url, legislatura, last_success, last_failure, consecutive_failures, cost, samples)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+                ON CONFLICT (url) DO UPDATE SET
+                    legislatura = excluded.legislatura,
+                    last_success = COALESCE(excluded.last_success, last_success),
+                    last_failure = COALESCE(excluded.last_failure, last_failure),
+                    consecutive_failures = CASE WHEN excluded.last_success IS NULL
+                                                THEN consecutive_failures + 1 ELSE 0 END,
+                    cost = CASE WHEN cost IS NULL THEN excluded.cost
+                                ELSE cost + ? * (excluded.cost - cost) END,
+                    samples = samples + 1
+                """,
+                (url, legislatura, now if success else None, None if success else now,
+                 0 if success else 1, elapsed, self.smoothing),
+            )
+        finally:
+            conn.close()
+
+    def lookup(self, urls: Iterable[str]) -> Dict[str, sqlite3.Row]:
+        """History rows of the given URLs (URLs never seen are missing)"""
+        urls = list(urls)
+        rows = {}
+        conn = self._connect()
+        try:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(f"SELECT * FROM url_history WHERE url IN ({placeholders})", chunk):
+                    rows[row["url"]] = row
+        finally:
+            conn.close()
+        return rows
+
+    def average_costs(self) -> Dict[Optional[str], float]:
+        """Mean cost per legislatura, plus the overall mean under the key None"""
+        conn = self._connect()
+        try:
+            per_leg = conn.execute(
+                "SELECT legislatura, AVG(cost) AS cost FROM url_history WHERE cost IS NOT NULL GROUP BY legislatura"
+            ).fetchall()
+            overall = conn.execute("SELECT AVG(cost) FROM url_history WHERE cost IS NOT NULL").fetchone()[0]
+        finally:
+            conn.close()
+        costs = {row["legislatura"]: row["cost"] for row in per_leg}
+        costs[None] = overall
+        return costs
+
+
+@dataclass
+class SchedulePolicy:
+    """Knobs of the crawl order.
+
+    priority = new_weight * (never scraped) + legislatura_weight * (legislatura number)
+               - failure_penalty * (consecutive failures)
+    so with the defaults every never-scraped URL comes before any re-validation,
+    and within each of those bands newer legislaturas come first.
+    """
+    new_weight: float = 1000.0
+    legislatura_weight: float = 1.0
+    failure_penalty: float = 0.5
+    backoff_base: float = 60.0
+    backoff_max: float = 6 * 3600.0
+    default_cost: float = 5.0
+
+    def backoff(self, consecutive_failures: int) -> float:
+        """Seconds to wait before retrying a URL that failed this many times in a row"""
+        if consecutive_failures <= 0:
+            return 0.0
+        return min(self.backoff_base * 2 ** (consecutive_failures - 1), self.backoff_max)
+
+
+@dataclass
+class ScheduledTask:
+    url: str
+    legislatura: str
+    priority: float
+    est_cost: float
+    not_before: float = 0.0
+
+
+class CrawlScheduler:
+    """Orders session URLs by priority, backoff and expected cost"""
+
+    def __init__(self, history: CrawlHistory, policy: SchedulePolicy = None):
+        self.history = history
+        self.policy = policy or SchedulePolicy()
+
+    def plan(self, legislaturas: List[Dict]) -> List[ScheduledTask]:
+        """Turn legislatura entries (with data.links) into an ordered task list.
+
+        URLs still in failure backoff go last. Among equal priorities the most
+        expensive URLs go first (longest-processing-time-first), which keeps
+        the tail short when several workers share the list.
+        """
+        policy = self.policy
+        now = time.time()
+        urls = [url for leg in legislaturas for url in leg.get("data", {}).get("links", [])]
+        history = self.history.lookup(urls)
+        average_costs = self.history.average_costs()
+
+        tasks = []
+        seen = set()
+        for leg in legislaturas:
+            name = leg.get("name")
+            number = legislatura_number(leg)
+            fallback_cost = average_costs.get(name) or average_costs.get(None) or policy.default_cost
+            for url in leg.get("data", {}).get("links", []):
+                if url in seen:
+                    continue
+                seen.add(url)
+
+                row = history.get(url)
+                never_scraped = row is None or row["last_success"] is None
+                failures = row["consecutive_failures"] if row else 0
+                priority = (policy.new_weight * never_scraped
+                            + policy.legislatura_weight * number
+                            - policy.failure_penalty * failures)
+                not_before = row["last_failure"] + policy.backoff(failures) if failures else 0.0
+                est_cost = row["cost"] if row and row["cost"] is not None else fallback_cost
+                tasks.append(ScheduledTask(url, name, priority, est_cost, not_before))
+
+        tasks.sort(key=lambda task: (task.not_before > now, -task.priority, -task.est_cost))
+        return tasks
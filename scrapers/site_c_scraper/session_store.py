@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Iterator, Optional
+
+from scrapers.site_c_scraper.records import SessionRecord
+
+
+def chamber_from_file(file: str) -> str:
+    """'senadores.json' -> 'senadores'"""
+    return os.path.splitext(os.path.basename(file))[0]
+
+
+def _safe_name(value: Optional[str], default: str) -> str:
+    return re.sub(r'[\\/*?:"<>| ]', '-', value) if value else default
+
+
+class SessionStore:
+    """One JSON file per scraped session, laid out as <folder>/<chamber>/<legislatura>/<url hash>.json.
+
+    Files are written atomically, so several workers can save into the same
+    folder and readers never see half-written sessions. The file name only
+    depends on the URL, so re-scraping a URL overwrites its file even when
+    the session date on the page changed.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        os.makedirs(self.folder, exist_ok=True)
+
+    def session_path(self, chamber: Optional[str], legislatura: Optional[str], url: str) -> str:
+        """Path of the stored session of a URL"""
+        url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()[:10]
+        return os.path.join(
+            self.folder,
+            _safe_name(chamber, "unknown_chamber"),
+            _safe_name(legislatura, "unknown_legislatura"),
+            f"{url_hash}.json",
+        )
+
+    def save(self, record: SessionRecord) -> str:
+        """Store a scraped session and return its path"""
+        path = self.session_path(record.chamber, record.legislatura, record.url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def iter_paths(self, chamber: str = None, legislatura: str = None) -> Iterator[str]:
+        """Paths of stored sessions, optionally restricted to a chamber and/or legislatura"""
+        chambers = [chamber] if chamber else sorted(os.listdir(self.folder))
+        for chamber_name in chambers:
+            chamber_path = os.path.join(self.folder, chamber_name)
+            if not os.path.isdir(chamber_path):
+                continue
+            legislaturas = [legislatura] if legislatura else sorted(os.listdir(chamber_path))
+            for legislatura_name in legislaturas:
+                legislatura_path = os.path.join(chamber_path, legislatura_name)
+                if not os.path.isdir(legislatura_path):
+                    continue
+                for name in sorted(os.listdir(legislatura_path)):
+                    if name.endswith(".json"):
+                        yield os.path.join(legislatura_path, name)
+
+    def iter_sessions(self, chamber: str = None, legislatura: str = None) -> Iterator[Dict]:
+        """Stored sessions as the dicts produced by SessionRecord.to_dict"""
+        for path in self.iter_paths(chamber, legislatura):
+            with open(path, "r", encoding="utf-8") as f:
+                yield json.load(f)
@@ -12,12 +12,35 @@ import os
 import json
 import sys
 import logging
+import sqlite3
+from scrapers.site_c_scraper.records import (
+    SessionHeader, MatterRecord, AffairRecord, SessionRecord, parse_date, parse_time, parse_int
+)
+from scrapers.site_c_scraper.aggregates import SessionAggregates
+from scrapers.site_c_scraper.event_logging import start_async_logging, ProgressRenderer
+from scrapers.site_c_scraper.profiling import ScrapeProfiler
+from scrapers.site_c_scraper.scheduler import CrawlHistory, CrawlScheduler, SchedulePolicy
+from scrapers.site_c_scraper.session_store import SessionStore, chamber_from_file
+from scrapers.site_c_scraper.work_queue import SessionWorkQueue, LeaseHeartbeat, default_worker_id
 
 class ParliamentaryScraper:
-    def __init__(self, visible=False, output_folder="exported_excels", log_folder="logs"):
+    def __init__(self, visible=False, output_folder="exported_excels", log_folder="logs", data_folder="scraped_data",
+                 log_level=logging.INFO, profile_rate=0.0, profile_slow_threshold=None, profile_folder="profiles",
+                 export_excel=False, history_path=None):
         self.setup_driver(visible)
         self.output_folder = output_folder
         self.log_folder = log_folder
+        self.data_folder = data_folder
+        self.log_level = log_level
+        self.profile_folder = profile_folder
+        self.profile_rate = profile_rate
+        self.profile_slow_threshold = profile_slow_threshold
+        # Workbooks are normally produced afterwards by excel_export.export_workbooks;
+        # writing them inline keeps the old behaviour at the cost of scraping speed
+        self.export_excel = export_excel
+        # Crawl history used for scheduling; defaults to <data_folder>/crawl_history.sqlite3
+        self.history_path = history_path
+        self.last_event = {}
         self.setup_output_folder()
         self.setup_logging()
         
@@ -57,45 +80,51 @@ class ParliamentaryScraper:
         self.driver.set_page_load_timeout(15)
 
     def setup_output_folder(self):
-        """Create output and log folders if they don't exist"""
+        """Create output, log and data folders if they don't exist"""
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
         self.folder_path = os.path.join(project_root, self.output_folder)
         self.log_folder_path = os.path.join(project_root, self.log_folder)
+        self.data_folder_path = os.path.join(project_root, self.data_folder)
         
         os.makedirs(self.folder_path, exist_ok=True)
         os.makedirs(self.log_folder_path, exist_ok=True)
+        self.store = SessionStore(self.data_folder_path)
+        self.aggregates = SessionAggregates(os.path.join(self.data_folder_path, "aggregates.sqlite3"))
+        self.history = CrawlHistory(self.history_path or os.path.join(self.data_folder_path, "crawl_history.sqlite3"))
+        self.profiler = ScrapeProfiler(
+            os.path.join(project_root, self.profile_folder),
+            profile_rate=self.profile_rate,
+            slow_threshold=self.profile_slow_threshold,
+            logger=logging.getLogger('ParliamentaryScraper'),
+        )
 
     def setup_logging(self):
-        """Set up logging configuration"""
+        """Set up logging configuration.
+
+        Logging is asynchronous: the scraping thread only puts records on a queue
+        and a listener thread writes them. Besides the text log, one JSON event
+        per URL is written to a .jsonl file next to it. Per-URL detail lines are
+        logged at DEBUG, so pass log_level=logging.DEBUG to get them back.
+        """
         # Generate log filename with timestamp including milliseconds
         now = datetime.now()
-        log_filename = f"scraping_session_{now.strftime('%Y%m%d_%H%M%S')}_{now.microsecond//1000:03d}.log"
+        log_basename = f"scraping_session_{now.strftime('%Y%m%d_%H%M%S')}_{now.microsecond//1000:03d}"
+        log_filename = f"{log_basename}.log"
         log_filepath = os.path.join(self.log_folder_path, log_filename)
+        events_filepath = os.path.join(self.log_folder_path, f"{log_basename}_events.jsonl")
         
         # Create logger
         self.logger = logging.getLogger('ParliamentaryScraper')
-        self.logger.setLevel(logging.INFO)
         
         # Clear any existing handlers
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
         
-        # Create file handler
-        file_handler = logging.FileHandler(log_filepath, encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
-        
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s.%(msecs)03d - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        file_handler.setFormatter(formatter)
-        
-        # Add handler to logger
-        self.logger.addHandler(file_handler)
+        self.log_listener = start_async_logging(self.logger, log_filepath, events_filepath, level=self.log_level)
         
-        # Store log file path for reference
+        # Store log file paths for reference
         self.log_file_path = log_filepath
+        self.events_file_path = events_filepath
         
         # Log initial setup
         self.logger.info("=" * 80)
@@ -107,8 +136,6 @@ class ParliamentaryScraper:
     
     def extract_session_header(self):
         """Extract session header information with faster waits"""
-        header_data = {}
-
         def get_value(label):
             try:
                 cell = self.wait.until(
@@ -120,14 +147,28 @@ class ParliamentaryScraper:
             except:
                 return None
 
-        header_data['date'] = get_value("Fecha")
-        header_data['start_time'] = get_value("Inicia")
-        header_data['end_time'] = get_value("Termina")
-        header_data['starting_quorum'] = get_value("Quórum de inicio")
-        header_data['next_session'] = get_value("Próxima sesión")
-        header_data['presiding_officer'] = get_value("Presidió")
+        raw_date = get_value("Fecha")
+        raw_start_time = get_value("Inicia")
+        raw_end_time = get_value("Termina")
+        header = SessionHeader(
+            raw_date=raw_date,
+            session_date=parse_date(raw_date),
+            start_time=parse_time(raw_start_time),
+            end_time=parse_time(raw_end_time),
+            starting_quorum=get_value("Quórum de inicio"),
+            next_session=get_value("Próxima sesión"),
+            presiding_officer=get_value("Presidió"),
+            raw_start_time=raw_start_time,
+            raw_end_time=raw_end_time,
+        )
 
-        return header_data
+        # The raw text is kept either way; flag values the parsers didn't understand
+        for label, raw, parsed in (("Fecha", raw_date, header.session_date),
+                                   ("Inicia", raw_start_time, header.start_time),
+                                   ("Termina", raw_end_time, header.end_time)):
+            if raw and parsed is None:
+                self.logger.warning(f"Could not parse '{label}' value: {raw!r}")
+        return header
     
     def extract_matters_attended(self):
         """Extract 'Asuntos Atendidos' section with group + matter names"""
@@ -159,13 +200,9 @@ class ParliamentaryScraper:
                 # If the row is a matter entry (simpletextli with two columns)
                 elif "simpletextli" in cells[0].get_attribute("class") and len(cells) >= 2:
                     matter_name = cells[0].text.strip()
-                    count = cells[1].text.strip()
+                    count = parse_int(cells[1].text)
 
-                    matters.append({
-                        'group': current_group,
-                        'matter_name': matter_name,
-                        'count': count
-                    })
+                    matters.append(MatterRecord(current_group, matter_name, count))
 
         except TimeoutException:
             self.logger.warning("Could not find 'ASUNTOS ATENDIDOS' section")
@@ -200,26 +237,26 @@ class ParliamentaryScraper:
         return affairs
 
     def extract_single_affair(self, block, affair_id):
-        """Extract data from a single affair block and save using first words as keys"""
-        affair_data = {'affair_id': affair_id}
+        """Extract data from a single affair block into an AffairRecord"""
+        affair_data = AffairRecord(affair_id)
 
         try:
             # Extract title
             title_element = block.find_element(By.XPATH, ".//td[@class='simpletextmayor' or @class='simpletextmayor2'][1]")
             if title_element:
-                affair_data['title'] = title_element.text.strip()
+                affair_data.title = title_element.text.strip()
 
             # Extract main text (under title)
             text_element = block.find_element(By.XPATH, ".//td[@class='simpletextmayor2'][1]")
             if text_element:
-                affair_data['text'] = text_element.text.strip()
+                affair_data.text = text_element.text.strip()
 
             # Extract "Aspectos Relevantes"
             try:
                 aspects_element = block.find_element(By.XPATH, ".//font[contains(text(), 'Aspectos Relevantes')]/following-sibling::font[@class='simpletextmayor2']")
-                affair_data['Aspectos'] = aspects_element.text.strip()
+                affair_data.aspectos = aspects_element.text.strip()
             except NoSuchElementException:
-                affair_data['Aspectos'] = None
+                affair_data.aspectos = None
 
             # Extract "Último Trámite" and "Resultado"
             try:
@@ -248,32 +285,35 @@ class ParliamentaryScraper:
                         resultado = line.split("Resultado:")[-1].strip()
                         break
                 
-                affair_data['Último'] = ultimo
-                affair_data['Resultado'] = resultado
+                affair_data.ultimo = ultimo
+                affair_data.resultado = resultado
 
             except NoSuchElementException:
-                affair_data['Último'] = None
-                affair_data['Resultado'] = ''
+                affair_data.ultimo = None
+                affair_data.resultado = ''
 
             # Extract PDF link
             try:
                 # Look for <a> tag with class "tddatosazul" that contains "Ver archivo"
                 pdf_link_element = block.find_element(By.XPATH, ".//a[@class='tddatosazul'][contains(text(), 'Ver archivo')]")
-                affair_data['link'] = pdf_link_element.get_attribute('href')
+                affair_data.link = pdf_link_element.get_attribute('href')
             except NoSuchElementException:
                 # Alternative: look for any <a> tag that has an href pointing to a PDF
                 try:
                     pdf_link_element = block.find_element(By.XPATH, ".//a[contains(@href, '.pdf')]")
-                    affair_data['link'] = pdf_link_element.get_attribute('href')
+                    affair_data.link = pdf_link_element.get_attribute('href')
                 except NoSuchElementException:
-                    affair_data['link'] = None
+                    affair_data.link = None
 
             # Extract "Publicación en la Gaceta Parlamentaria"
             try:
                 pub_date_element = block.find_element(By.XPATH, ".//font[contains(text(), 'Publicación en la Gaceta Parlamentaria')]/following-sibling::font[@class='simpletextmayor2']")
-                affair_data['Publicación'] = pub_date_element.text.strip()
+                affair_data.raw_publicacion = pub_date_element.text.strip()
+                affair_data.publicacion = parse_date(affair_data.raw_publicacion)
+                if affair_data.raw_publicacion and affair_data.publicacion is None:
+                    self.logger.warning(f"Could not parse 'Publicación' of {affair_id}: {affair_data.raw_publicacion!r}")
             except NoSuchElementException:
-                affair_data['Publicación'] = None
+                affair_data.publicacion = None
 
         except Exception as e:
             self.logger.error(f"Single affair extraction error for {affair_id}: {e}")
@@ -281,115 +321,154 @@ class ParliamentaryScraper:
 
         return affair_data
 
-    def generate_session_id(self, date_str):
-        """Generate session ID from date string"""
-        if not date_str:
-            return datetime.now().strftime("%Y%m%d")
-        
-        try:
-            # Try to parse different date formats
-            for fmt in ['%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d']:
-                try:
-                    date_obj = datetime.strptime(date_str, fmt)
-                    return date_obj.strftime("%Y%m%d")
-                except ValueError:
-                    continue
-        except:
-            pass
-            
-        return datetime.now().strftime("%Y%m%d")
-
-    def save_session_to_excel(self, session_data):
+    def save_session_to_excel(self, session_data: SessionRecord):
         """Save a single session's data to Excel immediately"""
         try:
             # Safe filename based on session date
-            session_date = session_data['header'].get('date', 'unknown_date')
+            session_date = session_data.header.raw_date or 'unknown_date'
             safe_date = re.sub(r'[\\/*?:"<>|]', '-', session_date)
-            filename = f"parliamentary_session_{safe_date}.xlsx"
+            # Prefix with the chamber so senate and deputy sessions of the same day don't overwrite each other
+            prefix = f"{session_data.chamber}_" if session_data.chamber else ""
+            filename = f"parliamentary_session_{prefix}{safe_date}.xlsx"
             filepath = os.path.join(self.folder_path, filename)
 
-            session_id = self.generate_session_id(session_date)
-
-            # Prepare data with session_id
-            header = session_data['header'].copy()
-            header['session_id'] = session_id
-            header['url'] = session_data['url']
-            header['scraped_at'] = session_data['scraped_at']
-
-            matters_data = [{**m, 'session_id': session_id} for m in session_data['matters_attended']]
-            affairs_data = [{**a, 'session_id': session_id} for a in session_data['affairs']]
+            session_id = session_data.session_id
+            matters_count = len(session_data.matters)
+            affairs_count = len(session_data.affairs)
 
-            # Save to Excel
+            # Rows are plain tuples built straight from the records, no per-row dict copies
             with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                pd.DataFrame([header]).to_excel(writer, sheet_name='Session_Headers', index=False)
-                if matters_data:
-                    pd.DataFrame(matters_data).to_excel(writer, sheet_name='Matters_Attended', index=False)
-                if affairs_data:
-                    pd.DataFrame(affairs_data).to_excel(writer, sheet_name='Affairs', index=False)
+                pd.DataFrame.from_records([session_data.header_row()], columns=SessionRecord.HEADER_COLUMNS) \
+                    .to_excel(writer, sheet_name='Session_Headers', index=False)
+                if matters_count:
+                    pd.DataFrame.from_records(session_data.matter_rows(), columns=SessionRecord.MATTER_COLUMNS) \
+                        .to_excel(writer, sheet_name='Matters_Attended', index=False)
+                if affairs_count:
+                    pd.DataFrame.from_records(session_data.affair_rows(), columns=SessionRecord.AFFAIR_COLUMNS) \
+                        .to_excel(writer, sheet_name='Affairs', index=False)
 
             # Log successful save
-            self.logger.info(f"SUCCESS - Saved session to: {filename}")
-            self.logger.info(f"  - Session date: {session_date}")
-            self.logger.info(f"  - Session ID: {session_id}")
-            self.logger.info(f"  - Matters: {len(matters_data)}")
-            self.logger.info(f"  - Affairs: {len(affairs_data)}")
+            self.logger.debug(f"SUCCESS - Saved session to: {filename}")
+            self.logger.debug(f"  - Session date: {session_date}")
+            self.logger.debug(f"  - Session ID: {session_id}")
+            self.logger.debug(f"  - Matters: {matters_count}")
+            self.logger.debug(f"  - Affairs: {affairs_count}")
 
             return filepath
 
         except Exception as e:
             self.logger.error(f"ERROR saving session to Excel: {e}")
-            self.logger.error(f"  - URL: {session_data.get('url', 'Unknown')}")
+            self.logger.error(f"  - URL: {session_data.url}")
             return None
     
-    def scrape_session(self, url):
-        """Main method to scrape a parliamentary session and save immediately"""
-        start_time = time.time()
+    def save_session_to_store(self, session_data: SessionRecord):
+        """Save a single session to the JSON session store used by the post-processing stages"""
         try:
-            print(f"Scraping: {url}", end=" ... ", flush=True)
-            self.logger.info(f"STARTING - {url}")
-            
+            path = self.store.save(session_data)
+            self.logger.debug(f"STORED - {os.path.relpath(path, self.data_folder_path)}")
+        except Exception as e:
+            self.logger.error(f"ERROR saving session to store: {e}")
+            self.logger.error(f"  - URL: {session_data.url}")
+            return None
+
+        # Aggregates are a cache over the store; a failed update is logged but doesn't fail the save
+        try:
+            self.aggregates.update_session(session_data)
+        except Exception as e:
+            self.logger.error(f"ERROR updating aggregates: {e}")
+        return path
+
+    def scrape_session(self, url, chamber=None, legislatura=None):
+        """Main method to scrape a parliamentary session and save immediately.
+
+        When profiling is enabled, a `profile_rate` fraction of calls runs under
+        cProfile and calls slower than `profile_slow_threshold` seconds are
+        captured from a stack sampler; both are saved with the page HTML.
+        """
+        if not self.profiler.enabled:
+            return self._scrape_session(url, chamber, legislatura)
+
+        with self.profiler.profile(url, page_source=lambda: self.driver.page_source) as run:
+            result = self._scrape_session(url, chamber, legislatura)
+            run.meta['event'] = self.last_event
+        return result
+
+    def _scrape_session(self, url, chamber=None, legislatura=None):
+        """Scrape and save one session, emitting exactly one structured event
+        per URL (status, phase timings, counts, error class) to the events log.
+        """
+        start_time = time.time()
+        timings = {}
+        event = {'url': url, 'chamber': chamber, 'legislatura': legislatura}
+
+        def timed(phase, func, *args):
+            phase_start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timings[phase] = round(time.perf_counter() - phase_start, 3)
+
+        def load_page():
             self.driver.get(url)
-            
             # Reduced wait time and check if page is ready
             WebDriverWait(self.driver, 5).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
+
+        try:
+            self.logger.debug(f"STARTING - {url}")
+            
+            timed('load', load_page)
             
             # Extract all sections
-            session_data = {
-                'url': url,
-                'scraped_at': datetime.now().isoformat(),
-                'header': self.extract_session_header(),
-                'matters_attended': self.extract_matters_attended(),
-                'affairs': self.extract_affairs()
-            }
+            session_data = SessionRecord(
+                url=url,
+                scraped_at=datetime.now(),
+                header=timed('header', self.extract_session_header),
+                matters=timed('matters', self.extract_matters_attended),
+                affairs=timed('affairs', self.extract_affairs),
+                chamber=chamber,
+                legislatura=legislatura,
+            )
             
             # Save immediately after successful scrape
-            saved_file = self.save_session_to_excel(session_data)
+            saved_file = timed('store', self.save_session_to_store, session_data)
+            if saved_file and self.export_excel:
+                saved_file = timed('excel', self.save_session_to_excel, session_data)
             
-            end_time = time.time()
-            scraping_time = end_time - start_time
+            scraping_time = time.time() - start_time
+            event.update({
+                'status': 'success' if saved_file else 'save_failed',
+                'session_id': session_data.session_id,
+                'matters': len(session_data.matters),
+                'affairs': len(session_data.affairs),
+            })
             
             if saved_file:
-                print(f"✅ SUCCESS ({scraping_time:.2f}s)", flush=True)
-                self.logger.info(f"COMPLETED - {url} in {scraping_time:.2f}s")
-                self.logger.info("-" * 80)
+                self.logger.debug(f"COMPLETED - {url} in {scraping_time:.2f}s")
             else:
-                print(f"⚠️ SCRAPED BUT SAVE FAILED ({scraping_time:.2f}s)", flush=True)
                 self.logger.warning(f"SCRAPED BUT SAVE FAILED - {url} in {scraping_time:.2f}s")
-                self.logger.info("-" * 80)
             
             return session_data
             
         except Exception as e:
-            end_time = time.time()
-            scraping_time = end_time - start_time
+            scraping_time = time.time() - start_time
             error_msg = str(e)[:100] + "..." if len(str(e)) > 100 else str(e)
-            print(f"❌ FAILED ({scraping_time:.2f}s) - {str(e)[:50]}...", flush=True)
+            event.update({'status': 'failed', 'error_class': type(e).__name__, 'error': error_msg})
             self.logger.error(f"FAILED - {url} in {scraping_time:.2f}s")
             self.logger.error(f"  - Error: {error_msg}")
-            self.logger.info("-" * 80)
             return None
+
+        finally:
+            event['total_time'] = round(time.time() - start_time, 3)
+            event['timings'] = timings
+            self.last_event = event
+            self.logger.info("url_event", extra={'event': event})
+            try:
+                # Feeds the scheduler's cost estimates and failure backoff
+                self.history.record(url, legislatura, event.get('status') == 'success', event['total_time'])
+            except sqlite3.Error as e:
+                self.logger.error(f"ERROR recording crawl history: {e}")
     
     def close(self):
         """Close the webdriver and finalize logging"""
@@ -398,33 +477,62 @@ class ParliamentaryScraper:
         self.logger.info(f"Log saved to: {self.log_file_path}")
         self.logger.info("=" * 80)
         
-        # Close all handlers
+        # Flush the log queue, then close all handlers
+        self.log_listener.stop()
+        for handler in self.log_listener.handlers:
+            handler.close()
         for handler in self.logger.handlers[:]:
             handler.close()
             self.logger.removeHandler(handler)
             
         self.driver.quit()
 
-def process_sessions(file: str, scrape_all: bool, scrape_name: str = None, visible: bool = False, delay: float = 0.5):
-    """Process sessions from JSON file with auto-save after each successful scrape"""
+def load_sessions_to_scrape(file: str, scrape_all: bool, scrape_name: str = None) -> list:
+    """Legislatura entries of a JSON file: all of them, or only the one named `scrape_name`"""
     with open(file, "r", encoding="utf-8") as f:
         json_file = json.load(f)
 
     # Filter URLs based on scrape_all or scrape_name
     if scrape_all:
-        sessions_to_scrape = json_file
-    else:
-        sessions_to_scrape = [item for item in json_file if item.get("name") == scrape_name]
-        if not sessions_to_scrape:
-            print(f"No session found with name '{scrape_name}'")
-            return
-
-    scraper = ParliamentaryScraper(visible=visible)
+        return json_file
+    sessions_to_scrape = [item for item in json_file if item.get("name") == scrape_name]
+    if not sessions_to_scrape:
+        print(f"No session found with name '{scrape_name}'")
+    return sessions_to_scrape
+
+def process_sessions(file: str, scrape_all: bool, scrape_name: str = None, visible: bool = False, delay: float = 0.5,
+                     log_level: int = logging.INFO, progress_interval: float = 1.0,
+                     profile_rate: float = 0.0, profile_slow_threshold: float = None,
+                     policy: SchedulePolicy = None):
+    """Process sessions from JSON file with auto-save after each successful scrape.
+
+    URLs are processed in scheduler order (see scheduler.SchedulePolicy), not
+    file order: never-scraped URLs of the newest legislatura come first. URLs
+    that keep failing are skipped until their exponential backoff has passed
+    and picked up again by a later run.
+    """
+    sessions_to_scrape = load_sessions_to_scrape(file, scrape_all, scrape_name)
+    if not sessions_to_scrape:
+        return
+
+    chamber = chamber_from_file(file)
+    scraper = ParliamentaryScraper(visible=visible, log_level=log_level,
+                                   profile_rate=profile_rate, profile_slow_threshold=profile_slow_threshold)
+    progress = None
 
     try:
         successful_scrapes = 0
         failed_scrapes = 0
-        total_urls = sum(len(session.get("data", {}).get("links", [])) for session in sessions_to_scrape)
+        planned = CrawlScheduler(scraper.history, policy).plan(sessions_to_scrape)
+        now = time.time()
+        tasks = [task for task in planned if task.not_before <= now]
+        deferred = len(planned) - len(tasks)
+        total_urls = len(tasks)
+        if deferred:
+            print(f"⏳ Skipping {deferred} URLs still in failure backoff")
+        if not tasks:
+            print("Nothing to scrape right now.")
+            return
         total_time = 0
         
         print(f"🚀 Starting to process {total_urls} URLs...")
@@ -438,47 +546,36 @@ def process_sessions(file: str, scrape_all: bool, scrape_name: str = None, visib
         scraper.logger.info(f"Visible mode: {visible}")
         
         overall_start_time = time.time()
+        progress = ProgressRenderer(total_urls, interval=progress_interval).start()
         
-        for session in sessions_to_scrape:
-            session_name = session.get("name", "Unknown")
-            urls = session.get("data", {}).get("links", [])
-            scraper.logger.info(f"Processing session '{session_name}' with {len(urls)} URLs")
+        scraper.logger.info(f"Scheduled {total_urls} URLs ({deferred} skipped, still in failure backoff)")
+        
+        for task in tasks:
+            current_session = successful_scrapes + failed_scrapes + 1
+            progress.set_current(task.legislatura)
             
-            for i, url in enumerate(urls, 1):
-                current_session = successful_scrapes + failed_scrapes + 1
-                
-                # Print progress header
-                print(f"[{current_session:3d}/{total_urls}] ", end="", flush=True)
-                
-                result = scraper.scrape_session(url)
-                
-                if result:
-                    successful_scrapes += 1
-                else:
-                    failed_scrapes += 1
-                
-                # Calculate and display statistics
-                success_rate = (successful_scrapes / current_session) * 100
-                elapsed_time = time.time() - overall_start_time
-                avg_time_per_session = elapsed_time / current_session
-                estimated_remaining = (total_urls - current_session) * avg_time_per_session
-                
-                print(f"📊 Success: {successful_scrapes}/{current_session} ({success_rate:.1f}%) | "
-                      f"Avg: {avg_time_per_session:.1f}s | "
-                      f"ETA: {estimated_remaining/60:.1f}m", flush=True)
-                print("-" * 80, flush=True)
-                
-                # Log progress every 10 sessions
-                if current_session % 10 == 0:
-                    scraper.logger.info(f"PROGRESS - {current_session}/{total_urls} sessions processed")
-                    scraper.logger.info(f"  - Success rate: {success_rate:.1f}%")
-                    scraper.logger.info(f"  - Average time: {avg_time_per_session:.1f}s")
-                    scraper.logger.info(f"  - Estimated remaining: {estimated_remaining/60:.1f}m")
-                
-                if current_session < total_urls:  # Don't delay after last session
-                    time.sleep(delay)
+            result = scraper.scrape_session(task.url, chamber=chamber, legislatura=task.legislatura)
+            
+            if result:
+                successful_scrapes += 1
+            else:
+                failed_scrapes += 1
+            # The renderer redraws on its own timer; this only bumps counters
+            progress.update(bool(result))
+            
+            # Log progress every 10 sessions
+            if current_session % 10 == 0:
+                stats = progress.stats()
+                scraper.logger.info(f"PROGRESS - {current_session}/{total_urls} sessions processed")
+                scraper.logger.info(f"  - Success rate: {stats['success_rate']:.1f}%")
+                scraper.logger.info(f"  - Average time: {stats['avg']:.1f}s")
+                scraper.logger.info(f"  - Estimated remaining: {stats['eta']/60:.1f}m")
+            
+            if current_session < total_urls:  # Don't delay after last session
+                time.sleep(delay)
         
         # Final summary
+        progress.stop()
         total_elapsed = time.time() - overall_start_time
         print("=" * 80)
         print(f"🏁 SCRAPING COMPLETED!")
@@ -499,6 +596,8 @@ def process_sessions(file: str, scrape_all: bool, scrape_name: str = None, visib
         scraper.logger.info(f"Average per session: {total_elapsed/total_urls:.1f} seconds")
         
     except KeyboardInterrupt:
+        if progress:
+            progress.stop()
         current_session = successful_scrapes + failed_scrapes
         success_rate = (successful_scrapes / current_session * 100) if current_session > 0 else 0
         print(f"\n🛑 SCRAPING INTERRUPTED!")
@@ -513,8 +612,131 @@ def process_sessions(file: str, scrape_all: bool, scrape_name: str = None, visib
         scraper.logger.info(f"Success rate at interruption: {success_rate:.1f}%")
         
     except Exception as e:
+        if progress:
+            progress.stop()
         print(f"💥 Unexpected error during processing: {e}")
         scraper.logger.error(f"UNEXPECTED ERROR during batch processing: {e}")
     finally:
         scraper.close()
-        print("🔌 WebDriver closed.")
\ No newline at end of file
+        print("🔌 WebDriver closed.")
+
+def process_sessions_from_queue(file: str, queue_file: str, scrape_all: bool, scrape_name: str = None,
+                                visible: bool = False, delay: float = 0.5, worker_id: str = None,
+                                lease_seconds: float = 120, max_attempts: int = 3,
+                                log_level: int = logging.INFO, progress_interval: float = 1.0,
+                                profile_rate: float = 0.0, profile_slow_threshold: float = None,
+                                policy: SchedulePolicy = None):
+    """Pull session URLs from a shared lease queue so many workers can split one crawl.
+
+    Every worker may call this with the same JSON file and queue file: URLs are
+    enqueued idempotently, and each URL is leased by exactly one worker at a time.
+    The first worker started after a crawl has finished begins the next one,
+    re-queueing done URLs for re-validation and failed URLs after their backoff
+    (see SessionWorkQueue.enqueue_tasks).
+    Leases of dead workers expire and are picked up by the others. The crawl
+    history lives next to the queue file, so every worker plans with the same
+    history and a joining worker can't re-prioritize the queue from its own.
+    """
+    sessions_to_scrape = load_sessions_to_scrape(file, scrape_all, scrape_name)
+    if not sessions_to_scrape:
+        return
+
+    worker_id = worker_id or default_worker_id()
+    history_path = os.path.join(os.path.dirname(os.path.abspath(queue_file)), "crawl_history.sqlite3")
+    scraper = ParliamentaryScraper(visible=visible, log_level=log_level,
+                                   profile_rate=profile_rate, profile_slow_threshold=profile_slow_threshold,
+                                   history_path=history_path)
+
+    policy = policy or SchedulePolicy()
+    progress = None
+
+    successful_scrapes = 0
+    failed_scrapes = 0
+    try:
+        # Inside the try so a locked or unreachable queue file still closes Chrome and the log listener.
+        # Workers share one history, so re-planning on join only refreshes pending URLs with the same data
+        queue = SessionWorkQueue(queue_file, lease_seconds=lease_seconds, max_attempts=max_attempts)
+        added = queue.enqueue_tasks(CrawlScheduler(scraper.history, policy).plan(sessions_to_scrape),
+                                    source_file=file)
+
+        print(f"🚀 Worker {worker_id} joined queue '{queue_file}' ({added} URLs enqueued or re-prioritized)")
+        print("=" * 80)
+
+        scraper.logger.info("QUEUE PROCESSING STARTED")
+        scraper.logger.info(f"Worker id: {worker_id}")
+        scraper.logger.info(f"Queue file: {queue_file}")
+        scraper.logger.info(f"URLs enqueued or re-prioritized: {added}")
+        scraper.logger.info(f"Queue state: {queue.counts()}")
+
+        overall_start_time = time.time()
+        progress = ProgressRenderer(queue.counts()[SessionWorkQueue.PENDING], interval=progress_interval).start()
+
+        while True:
+            task = queue.lease(worker_id)
+            if task is None:
+                next_at = queue.next_available_at()
+                if next_at is None:
+                    break
+                # Everything left is in failure backoff; wait for it instead of leaving the crawl.
+                # Wake up at least once per lease period in case other workers add or release URLs.
+                wait = min(max(next_at - time.time(), 1.0), queue.lease_seconds)
+                scraper.logger.info(f"All pending URLs in backoff, waiting {wait:.0f}s")
+                progress.set_current("waiting for backoff")
+                time.sleep(wait)
+                continue
+
+            url = task["url"]
+            progress.set_current(task["legislatura"])
+
+            with LeaseHeartbeat(queue, worker_id):
+                result = scraper.scrape_session(url, chamber=chamber_from_file(task["source_file"] or file),
+                                                legislatura=task["legislatura"])
+
+            # A scrape whose save failed returns a record but stored nothing, so it must be retried
+            event = scraper.last_event
+            succeeded = result is not None and event.get('status') == 'success'
+            if succeeded:
+                successful_scrapes += 1
+                if not queue.complete(worker_id, url):
+                    scraper.logger.warning(f"Lease lost before completion - {url}")
+            else:
+                failed_scrapes += 1
+                queue.fail(worker_id, url, error=event.get('error_class') or event.get('status'),
+                           backoff=policy.backoff(task["attempts"]))
+            progress.update(succeeded)
+
+            time.sleep(delay)
+
+        progress.stop()
+        total_elapsed = time.time() - overall_start_time
+        state = queue.counts()
+        print("=" * 80)
+        print(f"🏁 QUEUE DRAINED FOR WORKER {worker_id}")
+        print(f"✅ Successful: {successful_scrapes}")
+        print(f"❌ Failed: {failed_scrapes}")
+        print(f"📦 Queue: {state}")
+        print(f"⏱️  Total Time: {total_elapsed/60:.1f} minutes")
+        print("=" * 80)
+
+        scraper.logger.info("QUEUE PROCESSING COMPLETED")
+        scraper.logger.info(f"Successful scrapes: {successful_scrapes}")
+        scraper.logger.info(f"Failed scrapes: {failed_scrapes}")
+        scraper.logger.info(f"Queue state: {state}")
+
+    except KeyboardInterrupt:
+        if progress:
+            progress.stop()
+        # Any lease still held simply expires and is reclaimed by another worker
+        print(f"\n🛑 WORKER {worker_id} INTERRUPTED!")
+        print(f"✅ Successfully saved: {successful_scrapes} sessions")
+        print(f"❌ Failed: {failed_scrapes} sessions")
+        scraper.logger.warning("QUEUE PROCESSING INTERRUPTED BY USER")
+
+    except Exception as e:
+        if progress:
+            progress.stop()
+        print(f"💥 Unexpected error during queue processing: {e}")
+        scraper.logger.error(f"UNEXPECTED ERROR during queue processing: {e}")
+    finally:
+        scraper.close()
+        print("🔌 WebDriver closed.")
@@ -0,0 +1,292 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Optional
+
+
+class SessionWorkQueue:
+    """SQLite-backed lease queue so several workers can share one crawl.
+
+    Every session URL is a row. A worker leases a URL for `lease_seconds`,
+    keeps the lease alive with heartbeats while it scrapes, and marks it done
+    or failed. Leases that are not renewed in time (dead worker) are handed
+    back to the pool the next time anyone asks for work.
+
+    The database can live on a filesystem shared by several machines. That is
+    why the default journal mode is the rollback journal ("DELETE"): WAL needs
+    shared memory and does not work over network filesystems. Pass
+    journal_mode="WAL" only when all workers run on the same host. Lease
+    expiry compares time.time() readings from different hosts, so multi-host
+    use needs synchronized clocks (NTP); keep lease_seconds well above the
+    expected clock skew.
+    """
+
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, db_path: str, lease_seconds: float = 120, max_attempts: int = 3,
+                 journal_mode: str = "DELETE"):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.journal_mode = journal_mode
+        folder = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(folder, exist_ok=True)
+        self.setup_database()
+
+    def _connect(self):
+        """Open a fresh connection; connections are never shared between threads or processes"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def setup_database(self):
+        """Create the task table if it doesn't exist"""
+        conn = self._connect()
+        try:
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    url TEXT PRIMARY KEY,
+                    legislatura TEXT,
+                    source_file TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at REAL,
+                    priority REAL NOT NULL DEFAULT 0,
+                    est_cost REAL NOT NULL DEFAULT 0,
+                    not_before REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            # Queues created before scheduling support lack these columns
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(tasks)")}
+            for column in ("priority", "est_cost", "not_before"):
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, lease_expires)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_order ON tasks(status, priority DESC, est_cost DESC)")
+        finally:
+            conn.close()
+
+    def enqueue_tasks(self, tasks: Iterable, source_file: str = None) -> int:
+        """Add scheduled tasks (see scheduler.CrawlScheduler.plan).
+
+        The queue file is reused from crawl to crawl. While a crawl is running
+        (URLs pending or leased), new URLs are inserted and pending URLs get
+        the new priority, cost estimate and backoff; URLs already done or
+        failed in this crawl are left alone, so workers joining late don't
+        re-scrape them. Once nothing is pending or leased the crawl is over,
+        and the next plan starts a new one: done and failed URLs go back to
+        pending with a fresh attempt count, which is how they get re-validated
+        or retried (no earlier than the scheduler's not_before).
+
+        Returns:
+            int: Number of URLs inserted, re-prioritized or re-queued.
+        """
+        now = time.time()
+        tasks = list(tasks)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Leases of dead workers must not keep a finished crawl looking active
+            self._reclaim_expired(conn, now)
+            active = conn.execute(
+                "SELECT 1 FROM tasks WHERE status IN (?, ?) LIMIT 1", (self.PENDING, self.LEASED)
+            ).fetchone()
+            refreshed = (self.PENDING,) if active else (self.PENDING, self.DONE, self.FAILED)
+
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO tasks (url, legislatura, source_file, status, updated_at, priority, est_cost, not_before) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET status = excluded.status, worker_id = NULL, lease_expires = NULL, "
+                "attempts = CASE WHEN tasks.status = excluded.status THEN tasks.attempts ELSE 0 END, "
+                "priority = excluded.priority, est_cost = excluded.est_cost, "
+                "not_before = excluded.not_before, updated_at = excluded.updated_at "
+                f"WHERE tasks.status IN ({', '.join('?' * len(refreshed))})",
+                [(task.url, task.legislatura, source_file, self.PENDING, now,
+                  task.priority, task.est_cost, task.not_before) + refreshed for task in tasks],
+            )
+            changed = conn.total_changes - before
+            conn.execute("COMMIT")
+            return changed
+        finally:
+            conn.close()
+
+    def _reclaim_expired(self, conn, now: float) -> int:
+        """Put leases that ran out back in the pool (must run inside a transaction).
+
+        A URL whose worker died on it `max_attempts` times (e.g. it crashes
+        Chrome) is parked as failed instead of taking down the next worker.
+        """
+        cursor = conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "worker_id = NULL, lease_expires = NULL, updated_at = ?, "
+            "last_error = 'lease expired' "
+            "WHERE status = ? AND lease_expires < ?",
+            (self.max_attempts, self.FAILED, self.PENDING, now, self.LEASED, now),
+        )
+        return cursor.rowcount
+
+    def reclaim_expired(self) -> int:
+        """Reclaim leases held by workers that stopped sending heartbeats"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            reclaimed = self._reclaim_expired(conn, time.time())
+            conn.execute("COMMIT")
+            return reclaimed
+        finally:
+            conn.close()
+
+    def lease(self, worker_id: str) -> Optional[Dict]:
+        """Lease the next pending URL for `worker_id`.
+
+        Highest priority first, then the most expensive URL first; URLs in
+        failure backoff are skipped until their `not_before` time.
+
+        Returns:
+            dict | None: The leased task, or None when nothing can be leased
+            right now (see next_available_at to tell "done" from "in backoff").
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock, so two workers can never grab the same row
+            conn.execute("BEGIN IMMEDIATE")
+            self._reclaim_expired(conn, now)
+            row = conn.execute(
+                "SELECT url, legislatura, source_file, attempts FROM tasks WHERE status = ? AND not_before <= ? "
+                "ORDER BY priority DESC, est_cost DESC, rowid LIMIT 1",
+                (self.PENDING, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE tasks SET status = ?, worker_id = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE url = ?",
+                (self.LEASED, worker_id, now + self.lease_seconds, now, row["url"]),
+            )
+            conn.execute("COMMIT")
+            task = dict(row)
+            task["attempts"] += 1
+            return task
+        finally:
+            conn.close()
+
+    def next_available_at(self) -> Optional[float]:
+        """Earliest time a pending URL can be leased, or None when nothing is pending"""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT MIN(not_before) FROM tasks WHERE status = ?", (self.PENDING,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def heartbeat(self, worker_id: str, url: str = None) -> int:
+        """Extend the leases held by `worker_id` (optionally only for one URL).
+
+        Returns:
+            int: Number of leases extended. 0 means the lease was lost.
+        """
+        now = time.time()
+        query = "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE status = ? AND worker_id = ?"
+        params = [now + self.lease_seconds, now, self.LEASED, worker_id]
+        if url is not None:
+            query += " AND url = ?"
+            params.append(url)
+
+        conn = self._connect()
+        try:
+            return conn.execute(query, params).rowcount
+        finally:
+            conn.close()
+
+    def complete(self, worker_id: str, url: str) -> bool:
+        """Mark a leased URL as done. Returns False if the lease was no longer ours."""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, lease_expires = NULL, last_error = NULL, updated_at = ? "
+                "WHERE url = ? AND worker_id = ? AND status = ?",
+                (self.DONE, time.time(), url, worker_id, self.LEASED),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def fail(self, worker_id: str, url: str, error: str = None, backoff: float = 0.0) -> bool:
+        """Release a leased URL after a failed scrape.
+
+        The URL goes back to pending, not to be leased again for `backoff`
+        seconds, until it has been attempted `max_attempts` times, after which
+        it is parked as failed.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "worker_id = NULL, lease_expires = NULL, last_error = ?, updated_at = ?, not_before = ? "
+                "WHERE url = ? AND worker_id = ? AND status = ?",
+                (self.max_attempts, self.FAILED, self.PENDING, error, now, now + backoff,
+                 url, worker_id, self.LEASED),
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks per status"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        result = {status: 0 for status in (self.PENDING, self.LEASED, self.DONE, self.FAILED)}
+        result.update({row["status"]: row["n"] for row in rows})
+        return result
+
+
+class LeaseHeartbeat:
+    """Background thread that renews a worker's leases while a scrape is running"""
+
+    def __init__(self, queue: SessionWorkQueue, worker_id: str, interval: float = None):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.interval = interval if interval is not None else max(queue.lease_seconds / 3, 1)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{worker_id}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.queue.heartbeat(self.worker_id)
+            except sqlite3.Error:
+                # A missed beat is not fatal; the next one will try again
+                pass
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def default_worker_id() -> str:
+    """Worker id unique across machines and processes"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
@@ -0,0 +1,134 @@
+import multiprocessing
+import sqlite3
+import time
+
+from scrapers.site_c_scraper.scheduler import ScheduledTask
+from scrapers.site_c_scraper.work_queue import LeaseHeartbeat, SessionWorkQueue
+
+
+def make_queue(tmp_path, urls, **kwargs) -> SessionWorkQueue:
+    queue = SessionWorkQueue(str(tmp_path / "queue.sqlite3"), **kwargs)
+    queue.enqueue_tasks([ScheduledTask(url, "LXVI", priority=0, est_cost=1) for url in urls])
+    return queue
+
+
+def status_of(queue: SessionWorkQueue, url: str) -> sqlite3.Row:
+    conn = sqlite3.connect(queue.db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute("SELECT * FROM tasks WHERE url = ?", (url,)).fetchone()
+    finally:
+        conn.close()
+
+
+def drain(db_path: str, worker_id: str) -> list:
+    """Lease and complete URLs until the queue is empty (runs in a child process)"""
+    queue = SessionWorkQueue(db_path)
+    leased = []
+    while True:
+        task = queue.lease(worker_id)
+        if task is None:
+            return leased
+        leased.append(task["url"])
+        assert queue.complete(worker_id, task["url"])
+
+
+def test_concurrent_workers_never_lease_the_same_url(tmp_path):
+    urls = [f"https://example.org/session/{i}" for i in range(300)]
+    queue = make_queue(tmp_path, urls)
+
+    # spawn gives every worker its own interpreter, like workers on separate machines
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(6) as pool:
+        results = pool.starmap(drain, [(queue.db_path, f"worker-{i}") for i in range(6)])
+
+    leased = [url for result in results for url in result]
+    assert len(leased) == len(set(leased))
+    assert set(leased) == set(urls)
+    assert queue.counts()[SessionWorkQueue.DONE] == len(urls)
+
+
+def test_expired_lease_is_reclaimed_then_parked_after_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, ["u"], lease_seconds=0.05, max_attempts=2)
+
+    assert queue.lease("dead-1")["url"] == "u"
+    assert queue.lease("other") is None
+    time.sleep(0.1)
+
+    task = queue.lease("dead-2")
+    assert task["url"] == "u" and task["attempts"] == 2
+    # The first worker lost its lease and can't complete the URL any more
+    assert not queue.complete("dead-1", "u")
+    time.sleep(0.1)
+
+    assert queue.lease("other") is None
+    row = status_of(queue, "u")
+    assert row["status"] == SessionWorkQueue.FAILED
+    assert row["last_error"] == "lease expired"
+    assert queue.next_available_at() is None
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    queue = make_queue(tmp_path, ["u"], lease_seconds=0.3)
+
+    assert queue.lease("busy")["url"] == "u"
+    with LeaseHeartbeat(queue, "busy", interval=0.05):
+        time.sleep(0.6)
+        assert queue.lease("other") is None
+    assert queue.complete("busy", "u")
+
+
+def test_fail_applies_backoff_until_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, ["u"], max_attempts=2)
+
+    assert queue.lease("w")["attempts"] == 1
+    before = time.time()
+    assert queue.fail("w", "u", error="TimeoutException", backoff=60)
+
+    assert queue.lease("w") is None
+    assert queue.next_available_at() >= before + 60
+    row = status_of(queue, "u")
+    assert row["status"] == SessionWorkQueue.PENDING
+    assert row["last_error"] == "TimeoutException"
+
+    # Backoff over: the URL is leased again, and a second failure parks it
+    conn = sqlite3.connect(queue.db_path)
+    conn.execute("UPDATE tasks SET not_before = 0")
+    conn.commit()
+    conn.close()
+    assert queue.lease("w")["attempts"] == 2
+    assert queue.fail("w", "u", backoff=60)
+    assert status_of(queue, "u")["status"] == SessionWorkQueue.FAILED
+
+
+def test_running_crawl_keeps_finished_urls_done(tmp_path):
+    queue = make_queue(tmp_path, ["a", "b"])
+    first = queue.lease("w")["url"]
+    assert queue.complete("w", first)
+
+    # A worker joining mid-crawl re-plans the same URLs
+    queue.enqueue_tasks([ScheduledTask(url, "LXVI", priority=0, est_cost=1) for url in ("a", "b", "c")])
+    assert status_of(queue, first)["status"] == SessionWorkQueue.DONE
+    assert status_of(queue, "c")["status"] == SessionWorkQueue.PENDING
+
+
+def test_finished_crawl_is_requeued_when_planned_again(tmp_path):
+    queue = make_queue(tmp_path, ["ok", "broken"], max_attempts=1)
+    for _ in range(2):
+        task = queue.lease("w")
+        if task["url"] == "ok":
+            queue.complete("w", "ok")
+        else:
+            queue.fail("w", "broken", error="TimeoutException")
+    assert queue.counts()[SessionWorkQueue.FAILED] == 1
+
+    retry_at = time.time() + 60
+    queue.enqueue_tasks([ScheduledTask("ok", "LXVI", priority=0, est_cost=1),
+                         ScheduledTask("broken", "LXVI", priority=0, est_cost=1, not_before=retry_at)])
+
+    assert queue.counts()[SessionWorkQueue.PENDING] == 2
+    broken = status_of(queue, "broken")
+    assert broken["attempts"] == 0 and broken["not_before"] == retry_at
+    # The re-validation is leasable right away, the failed URL only after its backoff
+    assert queue.lease("w")["url"] == "ok"
+    assert queue.lease("w") is None